@@ -1,19 +1,36 @@
 from fastapi import FastAPI, HTTPException, Depends, status, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import date, datetime, timedelta
 from bson import ObjectId
-from pymongo.mongo_client import MongoClient
+from concurrent.futures import ProcessPoolExecutor
+from pymongo import AsyncMongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
 from pymongo.server_api import ServerApi
 import bcrypt
 import jwt
 import os
+import asyncio
+import time
+import functools
 import random
-import string
+import secrets
+import base64
 import certifi
+import orjson
+import numpy as np
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+from fll_fast import (
+    build_week_score,
+    calculate_score,
+    fold_week_entries,
+    serialize_doc,
+    week_summary_increments,
+)
 
 # ==================== LOAD ENVIRONMENT ====================
 
@@ -24,65 +41,121 @@ SECRET_KEY = os.getenv("SECRET_KEY", "fantasy-life-league-secret-key-2025")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 24
 FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+BCRYPT_ROUNDS = 10
+BCRYPT_MAX_PENDING = 500
+WEEK_SUMMARY_CACHE_TTL_SECONDS = 60
+WEEK_SUMMARY_CACHE_MAX_ENTRIES = 10_000
+LEAGUE_CODE_ATTEMPTS = 5
 
 # ==================== FASTAPI APP & CORS ====================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_database()
+    yield
+    await client.close()
+    BCRYPT_POOL.shutdown()
+
+
 app = FastAPI(
     title="Fantasy Life League API",
     version="2.0.0",
     description="Backend for Fantasy Life League (habits + leagues)",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[FRONTEND_URL, "http://localhost:3000", "http://127.0.0.1:3000", "*"],
+    allow_origins=[FRONTEND_URL, "http://localhost:3000", "http://127.0.0.1:3000"],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["authorization", "content-type"],
 )
 
 # ==================== MONGODB CONNECTION ====================
 
-try:
-    client = MongoClient(
-        MONGO_URI,
-        server_api=ServerApi("1"),
-        tlsCAFile=certifi.where()
-    )
-    client.admin.command("ping")
-    print("✅ Successfully connected to MongoDB!")
-except Exception as e:
-    print(f"❌ MongoDB connection failed: {e}")
-    raise
+client = AsyncMongoClient(
+    MONGO_URI,
+    server_api=ServerApi("1"),
+    tlsCAFile=certifi.where(),
+    maxPoolSize=200,
+    minPoolSize=10,
+    maxIdleTimeMS=300_000,
+    waitQueueTimeoutMS=2000,
+    retryWrites=True,
+    compressors="zstd",
+)
 
 db = client["fantasy_life_league"]
 users_collection = db["users"]
 leagues_collection = db["leagues"]
 habit_entries_collection = db["habit_entries"]
+weekly_summaries_collection = db["weekly_summaries"]
+
+
+async def init_database() -> None:
+    try:
+        await client.admin.command("ping")
+        print("✅ Successfully connected to MongoDB!")
+    except Exception as e:
+        print(f"❌ MongoDB connection failed: {e}")
+        raise
 
-users_collection.create_index("email", unique=True)
+    await users_collection.create_index("email", unique=True)
+    await habit_entries_collection.create_index([("user_id", 1), ("date", -1)])
+    await leagues_collection.create_index("code", unique=True)
+    await weekly_summaries_collection.create_index([("user_id", 1), ("year", 1), ("week_number", 1)], unique=True)
 
 security = HTTPBearer()
 
+# ==================== PASSWORD HASHING ====================
+
+# bcrypt is pure CPU work; run it in worker processes so it never blocks the event loop.
+# Cores are shared between uvicorn workers so N workers don't spawn N * cpu_count hashers.
+BCRYPT_POOL = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 1) // WEB_CONCURRENCY))
+bcrypt_slots = asyncio.BoundedSemaphore(BCRYPT_MAX_PENDING)
+
+
+def _hash_password(password: bytes) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+
+def _check_password(password: bytes, password_hash: bytes) -> bool:
+    return bcrypt.checkpw(password, password_hash)
+
+
+async def run_in_bcrypt_pool(func, *args):
+    if bcrypt_slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    async with bcrypt_slots:
+        return await asyncio.get_running_loop().run_in_executor(BCRYPT_POOL, func, *args)
+
+
+def bcrypt_cost(password_hash: str) -> int:
+    # Hashes look like "$2b$12$<salt+hash>"; the second field is the cost factor.
+    try:
+        return int(password_hash.split("$")[2])
+    except (IndexError, ValueError):
+        return -1
+
 # ==================== UTILITY FUNCTIONS ====================
 
-def convert_objectids(obj: Any) -> Any:
+def _orjson_default(obj: Any) -> Any:
     if isinstance(obj, ObjectId):
         return str(obj)
-    if isinstance(obj, list):
-        return [convert_objectids(item) for item in obj]
-    if isinstance(obj, dict):
-        return {key: convert_objectids(value) for key, value in obj.items()}
-    return obj
+    raise TypeError
 
 
-def serialize_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
-    if not doc:
-        return doc
-    doc = convert_objectids(doc)
-    if "password_hash" in doc:
-        del doc["password_hash"]
-    return doc
+class MongoJSONResponse(ORJSONResponse):
+    # Encodes raw Mongo documents directly; orjson only calls back for ObjectIds.
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_orjson_default)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -93,25 +166,43 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> str:
+@functools.lru_cache(maxsize=4096)
+def _decode_token(token: str) -> Tuple[Optional[str], Optional[str], float]:
+    # Only successfully verified tokens are cached; decode errors propagate and are not stored.
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    return payload.get("user_id"), payload.get("league_id"), float(payload.get("exp", 0))
+
+
+async def verify_token_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> Tuple[str, Optional[str]]:
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("user_id")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token payload",
-            )
-        return user_id
+        user_id, league_id, expires_at = _decode_token(credentials.credentials)
     except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
 
+    if expires_at <= time.time():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+        )
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token payload",
+        )
+    return user_id, league_id
+
 
-def get_current_user_doc(user_id: str) -> Dict[str, Any]:
-    user = users_collection.find_one({"_id": ObjectId(user_id)})
+async def verify_token(claims: Tuple[str, Optional[str]] = Depends(verify_token_claims)) -> str:
+    return claims[0]
+
+
+async def get_current_user_doc(user_id: str, projection: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    user = await users_collection.find_one({"_id": ObjectId(user_id)}, projection)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
@@ -126,6 +217,9 @@ class HabitGoal(BaseModel):
     nutrition: Optional[int] = 1
 
 
+DEFAULT_GOALS = HabitGoal().model_dump()
+
+
 class UserBase(BaseModel):
     name: str
     email: EmailStr
@@ -173,129 +267,208 @@ class LeagueIn(BaseModel):
 class LeagueJoin(BaseModel):
     code: str
 
-# ==================== SCORING LOGIC ====================
-
-MAX_POINTS_PER_CATEGORY = 10.0
-
-def calculate_score(entry: Dict[str, Any], goals: Dict[str, Any]) -> Dict[str, float]:
-    points: Dict[str, float] = {}
-
-    for category, value in entry.items():
-        if value is None:
-            points[category] = 0.0
-            continue
-
-        if category in goals:
-            goal = goals.get(category)
-            if goal and goal > 0:
-                ratio = min(value / goal, 1.5)
-                points[category] = round(ratio * MAX_POINTS_PER_CATEGORY, 1)
-            elif category == "nutrition":
-                points[category] = MAX_POINTS_PER_CATEGORY if value >= 1 else 0.0
-            else:
-                points[category] = 0.0
-        else:
-            points[category] = 0.0
-
-    return points
-
 # ==================== AUTH ENDPOINTS ====================
 
 @app.post("/auth/signup", response_model=Token)
 async def register_user(user_in: UserIn):
-    if users_collection.find_one({"email": user_in.email}):
+    if await users_collection.find_one({"email": user_in.email}, {"_id": 1}):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
-    hashed_password = bcrypt.hashpw(user_in.password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    hashed_password = (await run_in_bcrypt_pool(_hash_password, user_in.password.encode("utf-8"))).decode("utf-8")
 
     new_user = {
         "name": user_in.name,
         "email": user_in.email,
         "password_hash": hashed_password,
-        "goals": HabitGoal().dict(),
+        "goals": DEFAULT_GOALS.copy(),
         "league_id": None,
         "created_at": datetime.utcnow(),
     }
-    result = users_collection.insert_one(new_user)
+    result = await users_collection.insert_one(new_user)
 
-    access_token = create_access_token(data={"user_id": str(result.inserted_id)})
+    access_token = create_access_token(data={"user_id": str(result.inserted_id), "league_id": None})
     return {"access_token": access_token}
 
 
 @app.post("/auth/login", response_model=Token)
 async def login_user(user_in: LoginIn):
-    user = users_collection.find_one({"email": user_in.email})
+    user = await users_collection.find_one({"email": user_in.email}, {"password_hash": 1, "league_id": 1})
     if not user or not user.get("password_hash"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
 
-    if not bcrypt.checkpw(user_in.password.encode("utf-8"), user["password_hash"].encode("utf-8")):
+    password_ok = await run_in_bcrypt_pool(
+        _check_password, user_in.password.encode("utf-8"), user["password_hash"].encode("utf-8")
+    )
+    if not password_ok:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
 
-    access_token = create_access_token(data={"user_id": str(user["_id"])})
+    # Lazily migrate hashes created with a different cost factor. This is best effort:
+    # it is skipped while the bcrypt pool is saturated and never blocks the login itself.
+    if bcrypt_cost(user["password_hash"]) != BCRYPT_ROUNDS and not bcrypt_slots.locked():
+        try:
+            new_hash = (await run_in_bcrypt_pool(_hash_password, user_in.password.encode("utf-8"))).decode("utf-8")
+            await users_collection.update_one(
+                {"_id": user["_id"], "password_hash": user["password_hash"]},
+                {"$set": {"password_hash": new_hash}},
+            )
+        except (HTTPException, PyMongoError):
+            pass
+
+    access_token = create_access_token(data={"user_id": str(user["_id"]), "league_id": user.get("league_id")})
     return {"access_token": access_token}
 
 
 @app.get("/auth/me", response_model=UserDB)
 async def get_current_user(user_id: str = Depends(verify_token)):
-    user_doc = get_current_user_doc(user_id)
+    user_doc = await get_current_user_doc(user_id, {"password_hash": 0})
     return serialize_doc(user_doc)
 
+# ==================== WEEK SUMMARY CACHE ====================
+
+# (user_id, year, week_number) -> (expires_at, week score)
+week_score_cache: Dict[Tuple[str, int, int], Tuple[float, Dict[str, Any]]] = {}
+# user_id -> number of invalidations; a read only caches if no write landed while it ran
+week_score_generation: Dict[str, int] = {}
+
+
+def get_cached_week_score(key: Tuple[str, int, int]) -> Optional[Dict[str, Any]]:
+    cached = week_score_cache.get(key)
+    if cached is None:
+        return None
+    expires_at, score = cached
+    if expires_at < time.monotonic():
+        week_score_cache.pop(key, None)
+        return None
+    return score
+
+
+def set_cached_week_score(key: Tuple[str, int, int], score: Dict[str, Any], generation: int) -> None:
+    if week_score_generation.get(key[0], 0) != generation:
+        return
+    if key not in week_score_cache and len(week_score_cache) >= WEEK_SUMMARY_CACHE_MAX_ENTRIES:
+        # Dicts keep insertion order, so the first key is the oldest entry.
+        week_score_cache.pop(next(iter(week_score_cache)))
+    week_score_cache[key] = (time.monotonic() + WEEK_SUMMARY_CACHE_TTL_SECONDS, score)
+
+
+def invalidate_week_score(user_id: str, year: int, week_number: int) -> None:
+    week_score_generation[user_id] = week_score_generation.get(user_id, 0) + 1
+    week_score_cache.pop((user_id, year, week_number), None)
+
 # ==================== HABIT HELPERS ====================
 
-def compute_week_summary_for_user(user_id: str) -> Dict[str, Any]:
-    today = datetime.now()
-    start_of_week = today - timedelta(days=today.weekday())
-    start_date_str = start_of_week.strftime("%Y-%m-%d")
-    week_number = today.isocalendar()[1]
+def week_score_from_summary(summary: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not summary:
+        return build_week_score(0, 0.0, {})
+    return build_week_score(
+        summary.get("days_logged", 0),
+        summary.get("total", 0.0),
+        summary.get("categories", {}),
+    )
 
-    entries = list(
-        habit_entries_collection.find(
-            {"user_id": ObjectId(user_id), "date": {"$gte": start_date_str}}
-        )
+
+async def compute_week_summary_for_user(user_id: str) -> Dict[str, Any]:
+    year, week_number, _ = datetime.now().isocalendar()
+
+    cache_key = (user_id, year, week_number)
+    cached_score = get_cached_week_score(cache_key)
+    if cached_score is not None:
+        return {"week": week_number, "score": cached_score}
+
+    generation = week_score_generation.get(user_id, 0)
+    summary = await weekly_summaries_collection.find_one(
+        {"user_id": ObjectId(user_id), "year": year, "week_number": week_number},
+        {"days_logged": 1, "total": 1, "categories": 1, "_id": 0},
     )
 
-    if not entries:
-        return {
-            "week": week_number,
-            "score": {
-                "days_logged": 0,
-                "total": 0.0,
-                "categories": {},
-            },
-        }
+    score = week_score_from_summary(summary)
+    set_cached_week_score(cache_key, score, generation)
 
-    total_points = 0.0
-    category_totals: Dict[str, float] = {}
-    days_logged = len(entries)
+    return {"week": week_number, "score": score}
 
-    for entry in entries:
-        total_points += entry.get("total_points", 0.0)
-        for cat, pts in entry.get("points", {}).items():
-            category_totals[cat] = category_totals.get(cat, 0.0) + pts
 
-    return {
-        "week": week_number,
-        "score": {
-            "days_logged": days_logged,
-            "total": round(total_points, 1),
-            "categories": {k: round(v, 1) for k, v in category_totals.items()},
-        },
-    }
+async def compute_week_scores_for_users(user_ids: List[ObjectId]) -> Dict[str, Dict[str, Any]]:
+    # Weekly totals are maintained on write, so this is one indexed read for the whole league.
+    year, week_number, _ = datetime.now().isocalendar()
+
+    scores: Dict[str, Dict[str, Any]] = {}
+    missing_ids: List[ObjectId] = []
+    for user_id in user_ids:
+        cached_score = get_cached_week_score((str(user_id), year, week_number))
+        if cached_score is not None:
+            scores[str(user_id)] = cached_score
+        else:
+            missing_ids.append(user_id)
+
+    if not missing_ids:
+        return scores
+
+    generations = {user_id: week_score_generation.get(str(user_id), 0) for user_id in missing_ids}
+    summaries = await weekly_summaries_collection.find(
+        {"user_id": {"$in": missing_ids}, "year": year, "week_number": week_number},
+        {"user_id": 1, "days_logged": 1, "total": 1, "categories": 1, "_id": 0},
+    ).to_list(None)
+    summary_map = {summary["user_id"]: summary for summary in summaries}
+
+    for user_id in missing_ids:
+        score = week_score_from_summary(summary_map.get(user_id))
+        scores[str(user_id)] = score
+        set_cached_week_score((str(user_id), year, week_number), score, generations[user_id])
+
+    return scores
+
+
+def week_date_bounds(year: int, week_number: int) -> Tuple[str, str]:
+    # Entries store their day as "%Y-%m-%d", which sorts the same as the dates themselves.
+    monday = date.fromisocalendar(year, week_number, 1)
+    return monday.isoformat(), (monday + timedelta(days=6)).isoformat()
+
+
+async def recompute_week_summary(user_id: str, year: int, week_number: int) -> None:
+    # Rebuild the weekly totals from the daily entries; used whenever the summary is missing.
+    first_day, last_day = week_date_bounds(year, week_number)
+    entries = await habit_entries_collection.find(
+        {"user_id": ObjectId(user_id), "date": {"$gte": first_day, "$lte": last_day}},
+        {"points": 1, "total_points": 1, "_id": 0},
+    ).to_list(None)
+
+    await weekly_summaries_collection.update_one(
+        {"user_id": ObjectId(user_id), "year": year, "week_number": week_number},
+        {"$set": fold_week_entries(entries)},
+        upsert=True,
+    )
+
+
+async def record_week_summary_delta(
+    user_id: str,
+    year: int,
+    week_number: int,
+    previous_entry: Optional[Dict[str, Any]],
+    points: Dict[str, float],
+    total_points: float,
+) -> None:
+    # Apply the difference between the new and the replaced daily entry to the weekly totals.
+    # Without an existing summary a delta would miss earlier days, so rebuild it instead.
+    result = await weekly_summaries_collection.update_one(
+        {"user_id": ObjectId(user_id), "year": year, "week_number": week_number},
+        {"$inc": week_summary_increments(previous_entry, points, total_points)},
+    )
+    if result.matched_count == 0:
+        await recompute_week_summary(user_id, year, week_number)
 
 # ==================== HABIT ENDPOINTS ====================
 
 @app.post("/habits/log", response_model=HabitEntryOut)
 async def log_habit_entry(entry_in: HabitEntryIn, user_id: str = Depends(verify_token)):
-    user = get_current_user_doc(user_id)
-    today = datetime.now().strftime("%Y-%m-%d")
+    user = await get_current_user_doc(user_id, {"goals": 1})
+    now = datetime.now()
+    today = now.strftime("%Y-%m-%d")
+    year, week_number, _ = now.isocalendar()
 
     entry_data = entry_in.dict(exclude_none=True)
     points = calculate_score(entry_data, user.get("goals", {}))
     total_points = sum(points.values())
 
-    week_number = datetime.now().isocalendar()[1]
-    year = datetime.now().year
-
     new_entry = {
         "user_id": ObjectId(user_id),
         "date": today,
@@ -307,26 +480,31 @@ async def log_habit_entry(entry_in: HabitEntryIn, user_id: str = Depends(verify_
         "logged_at": datetime.utcnow(),
     }
 
-    habit_entries_collection.update_one(
+    previous_entry = await habit_entries_collection.find_one_and_update(
         {"user_id": ObjectId(user_id), "date": today},
         {"$set": new_entry},
+        projection={"points": 1, "total_points": 1},
         upsert=True,
+        return_document=ReturnDocument.BEFORE,
     )
-
-    saved_entry = habit_entries_collection.find_one({"user_id": ObjectId(user_id), "date": today})
+    await record_week_summary_delta(user_id, year, week_number, previous_entry, points, total_points)
+    invalidate_week_score(user_id, year, week_number)
 
     return {
-        **saved_entry["entry"],
-        "date": saved_entry["date"],
-        "points": saved_entry["points"],
-        "total_points": saved_entry["total_points"],
+        **entry_data,
+        "date": today,
+        "points": points,
+        "total_points": total_points,
     }
 
 
 @app.get("/habits/today", response_model=HabitEntryOut)
 async def get_today_entry(user_id: str = Depends(verify_token)):
     today = datetime.now().strftime("%Y-%m-%d")
-    entry = habit_entries_collection.find_one({"user_id": ObjectId(user_id), "date": today})
+    entry = await habit_entries_collection.find_one(
+        {"user_id": ObjectId(user_id), "date": today},
+        {"entry": 1, "date": 1, "points": 1, "total_points": 1, "_id": 0},
+    )
 
     if not entry:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No entry today")
@@ -341,7 +519,7 @@ async def get_today_entry(user_id: str = Depends(verify_token)):
 
 @app.get("/habits/week")
 async def get_weekly_summary(user_id: str = Depends(verify_token)):
-    return compute_week_summary_for_user(user_id)
+    return await compute_week_summary_for_user(user_id)
 
 
 @app.get("/habits/history")
@@ -349,109 +527,130 @@ async def get_habit_history(
     days: int = Query(30, ge=7, le=90),
     user_id: str = Depends(verify_token),
 ):
-    start_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    now = datetime.now()
+    start_date = (now - timedelta(days=days)).strftime("%Y-%m-%d")
 
-    entries = list(
-        habit_entries_collection.find(
-            {"user_id": ObjectId(user_id), "date": {"$gte": start_date}}
-        ).sort("date", 1)
-    )
+    entries = await habit_entries_collection.find(
+        {"user_id": ObjectId(user_id), "date": {"$gte": start_date}},
+        {"date": 1, "entry.sleep": 1, "entry.study": 1, "total_points": 1, "_id": 0},
+    ).sort("date", 1).to_list(None)
 
-    history_data: List[Dict[str, Any]] = []
-    date_cursor = datetime.strptime(start_date, "%Y-%m-%d").date()
-    today_date = datetime.now().date()
     entry_map = {e["date"]: e for e in entries}
+    empty_entry = {"entry": {}, "total_points": 0.0}
 
-    while date_cursor <= today_date:
-        date_str = date_cursor.strftime("%Y-%m-%d")
-        data_point = {"date": date_str}
-
-        if date_str in entry_map:
-            entry = entry_map[date_str]
-            data_point["sleep"] = entry["entry"].get("sleep", 0)
-            data_point["study"] = entry["entry"].get("study", 0)
-            data_point["total_points"] = entry.get("total_points", 0.0)
-        else:
-            data_point["sleep"] = 0
-            data_point["study"] = 0
-            data_point["total_points"] = 0.0
+    # datetime64[D] renders as YYYY-MM-DD, so the whole date range is built in one C call.
+    today_date = np.datetime64(now.date(), "D")
+    date_range = np.arange(np.datetime64(start_date, "D"), today_date + np.timedelta64(1, "D")).astype(str).tolist()
 
-        history_data.append(data_point)
-        date_cursor += timedelta(days=1)
+    history_data: List[Dict[str, Any]] = []
+    for date_str in date_range:
+        entry = entry_map.get(date_str, empty_entry)
+        history_data.append(
+            {
+                "date": date_str,
+                "sleep": entry["entry"].get("sleep", 0),
+                "study": entry["entry"].get("study", 0),
+                "total_points": entry.get("total_points", 0.0),
+            }
+        )
 
     return history_data
 
 # ==================== LEAGUE ENDPOINTS ====================
 
 def generate_league_code() -> str:
-    return "".join(random.choices(string.ascii_uppercase + string.digits, k=6))
+    # Base32 is uppercase A-Z plus 2-7, so codes still survive the .upper() in /league/join.
+    return base64.b32encode(secrets.token_bytes(4))[:6].decode("ascii")
 
 
 @app.post("/league/create")
 async def create_league(league_in: LeagueIn, user_id: str = Depends(verify_token)):
-    user = get_current_user_doc(user_id)
+    user = await get_current_user_doc(user_id, {"league_id": 1})
     if user.get("league_id"):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already in a league")
 
-    new_code = generate_league_code()
-    new_league = {
-        "name": league_in.name,
-        "code": new_code,
-        "members": [ObjectId(user_id)],
-        "created_by": ObjectId(user_id),
-        "created_at": datetime.utcnow(),
-    }
-    result = leagues_collection.insert_one(new_league)
+    # The unique index on leagues.code rejects collisions; just draw a new code.
+    for _ in range(LEAGUE_CODE_ATTEMPTS):
+        new_code = generate_league_code()
+        new_league = {
+            "name": league_in.name,
+            "code": new_code,
+            "members": [ObjectId(user_id)],
+            "created_by": ObjectId(user_id),
+            "created_at": datetime.utcnow(),
+        }
+        try:
+            result = await leagues_collection.insert_one(new_league)
+            break
+        except DuplicateKeyError:
+            continue
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Could not allocate a league code, please retry",
+        )
     league_id = str(result.inserted_id)
 
-    users_collection.update_one({"_id": ObjectId(user_id)}, {"$set": {"league_id": league_id}})
+    await users_collection.update_one({"_id": ObjectId(user_id)}, {"$set": {"league_id": league_id}})
 
-    return {"id": league_id, "name": league_in.name, "code": new_code}
+    access_token = create_access_token(data={"user_id": user_id, "league_id": league_id})
+    return {"id": league_id, "name": league_in.name, "code": new_code, "access_token": access_token}
 
 
 @app.post("/league/join")
 async def join_league(join_in: LeagueJoin, user_id: str = Depends(verify_token)):
-    user = get_current_user_doc(user_id)
+    user = await get_current_user_doc(user_id, {"league_id": 1})
     if user.get("league_id"):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already in a league")
 
-    league = leagues_collection.find_one({"code": join_in.code.upper()})
+    league = await leagues_collection.find_one({"code": join_in.code.upper()}, {"name": 1, "code": 1})
     if not league:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invalid code")
 
-    leagues_collection.update_one(
+    await leagues_collection.update_one(
         {"_id": league["_id"]},
         {"$addToSet": {"members": ObjectId(user_id)}},
     )
 
     league_id = str(league["_id"])
-    users_collection.update_one({"_id": ObjectId(user_id)}, {"$set": {"league_id": league_id}})
+    await users_collection.update_one({"_id": ObjectId(user_id)}, {"$set": {"league_id": league_id}})
 
-    return {"id": league_id, "name": league["name"], "code": league["code"]}
+    access_token = create_access_token(data={"user_id": user_id, "league_id": league_id})
+    return {"id": league_id, "name": league["name"], "code": league["code"], "access_token": access_token}
 
 
 @app.get("/league/standings")
-async def get_league_standings(user_id: str = Depends(verify_token)):
-    user = get_current_user_doc(user_id)
-    league_id = user.get("league_id")
+async def get_league_standings(claims: Tuple[str, Optional[str]] = Depends(verify_token_claims)):
+    user_id, league_id = claims
+    if not league_id:
+        # Tokens issued before the user joined a league don't carry it yet.
+        user = await get_current_user_doc(user_id, {"league_id": 1})
+        league_id = user.get("league_id")
 
     if not league_id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not in a league")
 
-    league = leagues_collection.find_one({"_id": ObjectId(league_id)})
+    league = await leagues_collection.find_one({"_id": ObjectId(league_id)})
     if not league:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="League not found")
 
     member_ids = league.get("members", [])
-    members = list(users_collection.find({"_id": {"$in": member_ids}}, {"name": 1, "email": 1}))
+    members, week_scores = await asyncio.gather(
+        users_collection.find({"_id": {"$in": member_ids}}, {"name": 1, "email": 1}).to_list(None),
+        compute_week_scores_for_users(member_ids),
+    )
+
+    # Matchups aren't persisted yet; seed wins per league, member and ISO week so
+    # standings only change when scores do and the response stays cacheable.
+    year, week_number, _ = datetime.now().isocalendar()
 
     standings_data = []
 
     for member in members:
         member_id_str = str(member["_id"])
-        week_summary = compute_week_summary_for_user(member_id_str)["score"]
+        week_summary = week_scores[member_id_str]
 
-        wins = random.randint(0, 5)
+        wins = random.Random(f"{league_id}:{year}-{week_number}:{member_id_str}").randint(0, 5)
         losses = 5 - wins
         total_points = week_summary["total"] + (wins * 100 + losses * 50)
 
@@ -470,11 +669,14 @@ async def get_league_standings(user_id: str = Depends(verify_token)):
     for i, player in enumerate(standings_data):
         player["rank"] = i + 1
 
-    return convert_objectids({
-        "league": league,
-        "standings": standings_data,
-        "member_count": len(member_ids),
-    })
+    return MongoJSONResponse(
+        {
+            "league": league,
+            "standings": standings_data,
+            "member_count": len(member_ids),
+        },
+        headers={"Cache-Control": f"private, max-age={WEEK_SUMMARY_CACHE_TTL_SECONDS}"},
+    )
 
 # ==================== ROOT ENDPOINT ====================
 
@@ -496,4 +698,16 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    workers = os.cpu_count() or 1
+    # Spawned workers re-import this module and size their bcrypt pools from this.
+    os.environ.setdefault("WEB_CONCURRENCY", str(workers))
+    uvicorn.run(
+        "backend:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.environ["WEB_CONCURRENCY"]),
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+    )
@@ -1,65 +1,155 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, validator
-from typing import List, Optional
-from datetime import datetime, timedelta
-import hmac
-import hashlib
+from pydantic import (
+    AwareDatetime, BaseModel, BeforeValidator, ConfigDict, Field, PrivateAttr, TypeAdapter, ValidationError, field_validator
+)
+from typing import Annotated, List, Optional
+from datetime import datetime, timedelta, timezone
+import base64
 import json
+import hmac
+import math
+import functools
+import time
 from enum import Enum
 import numpy as np
+import sys
 
-app = FastAPI(title="Fantasy Life League - Health API")
+app = FastAPI(title="Fantasy Life League - Health API", default_response_class=ORJSONResponse)
 security = HTTPBearer()
 
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+def to_epoch_us(value: datetime) -> int:
+    """
+    Convert an aware datetime to integer epoch microseconds (exact, no float rounding)
+    """
+    return (value - EPOCH) // ONE_MICROSECOND
+
 # MARK: - Data Models
 
-class DeviceInfo(BaseModel):
+class HealthModel(BaseModel):
+    # Inbound payloads: reject unknown fields and make instances immutable
+    model_config = ConfigDict(extra='forbid', frozen=True)
+
+class DeviceInfo(HealthModel):
     model: str
     systemVersion: str
     identifierForVendor: str
 
-class HeartRateReading(BaseModel):
+class HeartRateReading(HealthModel):
     bpm: float
-    timestamp: datetime
+    timestamp: AwareDatetime
 
-class WorkoutData(BaseModel):
+class WorkoutData(HealthModel):
     type: int
     duration: float
     calories: float
     distance: float
-    startDate: datetime
-    endDate: datetime
+    startDate: AwareDatetime
+    endDate: AwareDatetime
     source: str
+    
+    # Epoch microseconds, converted once so checks are plain integer compares
+    _start_us: int = PrivateAttr()
+    _end_us: int = PrivateAttr()
+    
+    @field_validator('source')
+    @classmethod
+    def intern_source(cls, v: str) -> str:
+        # Sources repeat across submissions; interning makes equality a pointer compare
+        return sys.intern(v)
+    
+    def model_post_init(self, __context) -> None:
+        self._start_us = to_epoch_us(self.startDate)
+        self._end_us = to_epoch_us(self.endDate)
 
-class RawHealthData(BaseModel):
-    date: datetime
-    steps: float
-    calories: float
+def canonical_json(value):
+    """
+    Convert dumped model values to the client's signing encoding (see RawHealthData.canonical_bytes)
+    """
+    if isinstance(value, dict):
+        return {key: canonical_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [canonical_json(item) for item in value]
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+class RawHealthData(HealthModel):
+    date: AwareDatetime
+    # Bounds are enforced inside pydantic-core rather than in Python validators
+    steps: float = Field(ge=0, le=100000)
+    calories: float = Field(ge=0, le=10000)
     distance: float
     workouts: List[WorkoutData]
     heartRateReadings: List[HeartRateReading]
     deviceInfo: DeviceInfo
-    timestamp: datetime
-    
-    @validator('steps')
-    def validate_steps(cls, v):
-        if v < 0 or v > 100000:
-            raise ValueError('Steps must be between 0 and 100,000')
-        return v
-    
-    @validator('calories')
-    def validate_calories(cls, v):
-        if v < 0 or v > 10000:
-            raise ValueError('Calories must be between 0 and 10,000')
-        return v
+    timestamp: AwareDatetime
+    
+    # Struct-of-arrays views of the nested lists, built once at parse time
+    _heart_rate_bpm: np.ndarray = PrivateAttr()
+    _workout_calories: np.ndarray = PrivateAttr()
+    _workout_durations: np.ndarray = PrivateAttr()
+    _workout_start_us: np.ndarray = PrivateAttr()
+    _workout_end_us: np.ndarray = PrivateAttr()
+    _timestamp_us: int = PrivateAttr()
+    _canonical_bytes: Optional[bytes] = PrivateAttr(default=None)
+    
+    def canonical_bytes(self) -> bytes:
+        """
+        The exact bytes the iOS client signs, built once and reused.
+        
+        Canonical form (healthKitApi.swift createVerifiedData): JSONEncoder with
+        .sortedKeys and .withoutEscapingSlashes, .iso8601 dates. That is compact JSON
+        with sorted keys, UTF-8 strings, whole-number doubles written as integers
+        and UTC dates at second precision ("2025-01-01T08:00:00Z")
+        """
+        if self._canonical_bytes is None:
+            self._canonical_bytes = json.dumps(
+                canonical_json(self.model_dump()),
+                sort_keys=True, separators=(',', ':'), ensure_ascii=False
+            ).encode()
+        return self._canonical_bytes
+    
+    def model_post_init(self, __context) -> None:
+        self._timestamp_us = to_epoch_us(self.timestamp)
+        n_workouts = len(self.workouts)
+        self._heart_rate_bpm = np.fromiter(
+            (r.bpm for r in self.heartRateReadings), dtype=np.float64, count=len(self.heartRateReadings)
+        )
+        self._workout_calories = np.fromiter(
+            (w.calories for w in self.workouts), dtype=np.float64, count=n_workouts
+        )
+        self._workout_durations = np.fromiter(
+            (w.duration for w in self.workouts), dtype=np.float64, count=n_workouts
+        )
+        self._workout_start_us = np.fromiter(
+            (w._start_us for w in self.workouts), dtype=np.int64, count=n_workouts
+        )
+        self._workout_end_us = np.fromiter(
+            (w._end_us for w in self.workouts), dtype=np.int64, count=n_workouts
+        )
 
-class VerifiedHealthData(BaseModel):
+def decode_signature(value):
+    """
+    The iOS client sends the HMAC as base64; decode it once while parsing
+    """
+    if isinstance(value, str):
+        return base64.b64decode(value, validate=True)
+    return value
+
+class VerifiedHealthData(HealthModel):
     rawData: RawHealthData
-    signature: str
+    signature: Annotated[bytes, BeforeValidator(decode_signature)]
     version: str
 
-class HealthDataSubmission(BaseModel):
+class HealthDataSubmission(HealthModel):
     userId: str
     data: VerifiedHealthData
 
@@ -69,6 +159,24 @@ class ValidationResult(BaseModel):
     warnings: List[str]
     errors: List[str]
 
+class SubmissionResult(BaseModel):
+    accepted: bool
+    points: Optional[int] = None
+    validation: Optional[ValidationResult] = None
+    message: str
+
+class BatchSubmissionResult(BaseModel):
+    results: List[SubmissionResult]
+
+def model_json_response(model: BaseModel) -> Response:
+    """
+    Serialize a response model to JSON in pydantic-core (single pass, no dict)
+    """
+    return Response(
+        content=model.model_dump_json(exclude_none=True),
+        media_type="application/json"
+    )
+
 # MARK: - Anti-Cheating Configuration
 
 class CheatDetectionConfig:
@@ -85,46 +193,198 @@ class CheatDetectionConfig:
     MAX_SUBMISSION_AGE_HOURS = 2
     MIN_SUBMISSION_INTERVAL_MINUTES = 5
     
+    # A batch can only hold what the two checks above would ever accept:
+    # one payload per interval inside the submission age window (24 today)
+    MAX_BATCH_SUBMISSIONS = MAX_SUBMISSION_AGE_HOURS * 60 // MIN_SUBMISSION_INTERVAL_MINUTES
+    
+    # Signature checks stay off until per-user signing keys exist
+    VERIFY_SIGNATURES = False
+    SUBMISSION_HISTORY_LIMIT = 100  # Minimum submissions remembered per user
+    
     # Anomaly detection
     ENABLE_STATISTICAL_ANALYSIS = True
     Z_SCORE_THRESHOLD = 3.0  # Standard deviations from mean
+    STATS_WINDOW_SIZE = 30  # Days of history kept per metric
+    MIN_STATS_HISTORY = 7  # Days needed before anomaly checks run
+
+# MARK: - Workout Rules
+
+TRUSTED_SOURCES = frozenset(sys.intern(source) for source in (
+    'com.apple.health',
+    'com.apple.Health',
+    'com.nike.nikeplus-gps',
+    'com.strava.Strava',
+    'com.fitbit.FitbitMobile'
+))
+
+@functools.lru_cache(maxsize=256)
+def is_trusted_source(source: str) -> bool:
+    # Bounded by the handful of distinct sources clients actually report
+    return source in TRUSTED_SOURCES
+
+MAX_WORKOUT_DURATION_SECONDS = 86400  # 24 hours
+MAX_CALORIES_PER_MINUTE = 30  # Very high burn rate
+
+def workout_rule_masks(data: RawHealthData, now_us: int):
+    """
+    Evaluate every per-workout rule over whole arrays at once.
+    
+    Returns boolean masks (too_long, in_future, reversed_times, high_burn) plus the
+    per-workout burn rate, so messages only need building for flagged workouts
+    """
+    durations = data._workout_durations
+    start_us = data._workout_start_us
+    
+    burn_rate = np.zeros_like(durations)
+    np.divide(data._workout_calories, durations / 60, out=burn_rate, where=durations > 0)
+    
+    return (
+        durations > MAX_WORKOUT_DURATION_SECONDS,
+        start_us > now_us,
+        data._workout_end_us < start_us,
+        burn_rate > MAX_CALORIES_PER_MINUTE,
+        burn_rate,
+    )
 
 # MARK: - In-Memory Storage (Replace with Redis/Database in production)
 
+class RollingWindow:
+    """
+    Fixed-size ring buffer with a running mean/variance (sliding-window Welford),
+    so pushes are O(1) amortized and reading mean/std needs no array pass.
+    
+    Sliding updates leave rounding residue in m2: the statistics are rebuilt from
+    the buffer once per wrap, and a window of one repeated value has exactly zero std
+    """
+    __slots__ = ('values', 'head', 'count', 'mean', 'm2', 'repeats')
+    
+    def __init__(self, size: int):
+        self.values = np.zeros(size, dtype=np.float64)
+        self.head = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.repeats = 0
+    
+    def push(self, value: float) -> None:
+        size = len(self.values)
+        if self.count and value == self.values[self.head - 1]:
+            self.repeats += 1
+        else:
+            self.repeats = 1
+        
+        if self.count < size:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+        else:
+            # Window is full: replace the oldest value in the running statistics
+            old = float(self.values[self.head])
+            new_mean = self.mean + (value - old) / size
+            self.m2 += (value - old) * (value - new_mean + old - self.mean)
+            self.mean = new_mean
+        self.values[self.head] = value
+        self.head = (self.head + 1) % size
+        
+        if self.repeats >= self.count:
+            self.mean = float(value)
+            self.m2 = 0.0
+        elif self.head == 0:
+            # Two-pass recompute over the buffer clears accumulated drift
+            self.mean = float(self.values.mean())
+            self.m2 = float(self.values.var()) * size
+    
+    @property
+    def std(self) -> float:
+        # Population standard deviation, matching np.std
+        if self.count == 0:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / self.count)
+
+class SubmissionHistory:
+    """
+    Accepted submission times as sorted epoch microseconds in a growable int64 buffer,
+    so window queries are a binary search instead of a Python scan
+    """
+    __slots__ = ('times', 'size')
+    
+    def __init__(self, capacity: int = 8):
+        self.times = np.empty(capacity, dtype=np.int64)
+        self.size = 0
+    
+    def append(self, timestamp_us: int) -> None:
+        if self.size == len(self.times):
+            limit = CheatDetectionConfig.SUBMISSION_HISTORY_LIMIT
+            if self.size >= 2 * limit:
+                # Keep the most recent `limit` entries; one copy per `limit` appends
+                self.times[:limit] = self.times[self.size - limit:self.size]
+                self.size = limit
+            else:
+                grown = np.empty(min(2 * len(self.times), 2 * limit), dtype=np.int64)
+                grown[:self.size] = self.times[:self.size]
+                self.times = grown
+        self.times[self.size] = timestamp_us
+        self.size += 1
+    
+    def count_after(self, since_us: int) -> int:
+        """
+        Number of submissions strictly after since_us
+        """
+        return self.size - int(np.searchsorted(self.times[:self.size], since_us, side='right'))
+
 user_submission_history = {}
 user_statistics = {}
 
 # MARK: - Cryptographic Verification
 
+hmac_sha256 = functools.partial(hmac.digest, digest='sha256')
+
 def verify_signature(data: VerifiedHealthData, signing_key: str) -> bool:
     """
     Verify the HMAC signature of the health data
     """
     try:
-        # Recreate the signature
-        raw_data_dict = data.rawData.dict()
-        json_data = json.dumps(raw_data_dict, sort_keys=True, default=str)
+        # Recreate the signature over the bytes the client signed (see RawHealthData.canonical_bytes)
+        expected_signature = hmac_sha256(signing_key.encode(), data.rawData.canonical_bytes())
         
-        expected_signature = hmac.new(
-            signing_key.encode(),
-            json_data.encode(),
-            hashlib.sha256
-        ).hexdigest()
-        
-        # Compare signatures (constant-time comparison)
+        # Compare raw MAC bytes (constant-time comparison)
         return hmac.compare_digest(data.signature, expected_signature)
     except Exception as e:
         print(f"Signature verification error: {e}")
         return False
 
+def get_signing_key(user_id: str) -> str:
+    # TODO: Get user's signing key from database
+    return "your-secret-key-here"  # Should be unique per user
+
+def verify_signatures(submissions: List[HealthDataSubmission]) -> List[bool]:
+    """
+    Verify a batch of submissions, looking up and encoding each user's key once.
+    
+    Each MAC is a single OpenSSL call; on SHA-NI hosts serial hashing already beats
+    multi-buffer AVX2 batching, so there is no interleaving to do in Python
+    """
+    keys = {}
+    results = []
+    for submission in submissions:
+        key = keys.get(submission.userId)
+        if key is None:
+            key = keys[submission.userId] = get_signing_key(submission.userId).encode()
+        expected_signature = hmac_sha256(key, submission.data.rawData.canonical_bytes())
+        results.append(hmac.compare_digest(submission.data.signature, expected_signature))
+    return results
+
 # MARK: - Anti-Cheating Validators
 
 class HealthDataValidator:
     
     @staticmethod
-    def validate_data_consistency(data: RawHealthData) -> ValidationResult:
+    def validate_data_consistency(data: RawHealthData, now_us: int) -> ValidationResult:
         """
         Comprehensive validation with multiple anti-cheating checks
+        
+        now_us is the request time in epoch microseconds, captured once by the caller
         """
         warnings = []
         errors = []
@@ -144,7 +404,7 @@ class HealthDataValidator:
                 score += 20
         
         # 2. Calories vs Activity Validation
-        workout_calories = sum(w.calories for w in data.workouts)
+        workout_calories = float(data._workout_calories.sum())
         
         if data.calories > 0:
             if workout_calories == 0 and data.steps < 100:
@@ -152,37 +412,36 @@ class HealthDataValidator:
             else:
                 score += 15
         
-        # 3. Workout Validation
-        for i, workout in enumerate(data.workouts):
+        # 3. Workout Validation (fast path: clean payloads never enter the message loop)
+        too_long, in_future, reversed_times, high_burn, burn_rate = workout_rule_masks(data, now_us)
+        flagged = too_long | in_future | reversed_times | high_burn
+        
+        for i in np.flatnonzero(flagged).tolist():
             # Duration check
-            if workout.duration > 86400:  # 24 hours
-                errors.append(f"Workout {i} duration ({workout.duration/3600:.1f}h) exceeds 24 hours")
+            if too_long[i]:
+                errors.append(f"Workout {i} duration ({data.workouts[i].duration/3600:.1f}h) exceeds 24 hours")
             
             # Future check
-            if workout.startDate > datetime.now():
+            if in_future[i]:
                 errors.append(f"Workout {i} is scheduled in the future")
             
             # Consistency check
-            if workout.endDate < workout.startDate:
+            if reversed_times[i]:
                 errors.append(f"Workout {i} end time is before start time")
             
             # Realistic calorie burn rate (very rough estimate)
-            if workout.duration > 0:
-                calories_per_minute = workout.calories / (workout.duration / 60)
-                if calories_per_minute > 30:  # Very high burn rate
-                    warnings.append(
-                        f"Workout {i} has unusually high calorie burn rate "
-                        f"({calories_per_minute:.1f} cal/min)"
-                    )
+            if high_burn[i]:
+                warnings.append(
+                    f"Workout {i} has unusually high calorie burn rate "
+                    f"({burn_rate[i]:.1f} cal/min)"
+                )
         
         if len(errors) == 0 and len(data.workouts) > 0:
             score += 25
         
         # 4. Heart Rate Validation
-        suspicious_hr_count = 0
-        for reading in data.heartRateReadings:
-            if reading.bpm < 30 or reading.bpm > 250:
-                suspicious_hr_count += 1
+        bpm = data._heart_rate_bpm
+        suspicious_hr_count = int(((bpm < 30) | (bpm > 250)).sum())
         
         if suspicious_hr_count > 0:
             warnings.append(
@@ -192,7 +451,7 @@ class HealthDataValidator:
             score += 15
         
         # 5. Timestamp Validation
-        submission_age = (datetime.now() - data.timestamp).total_seconds() / 3600
+        submission_age = (now_us - data._timestamp_us) / 3_600_000_000
         
         if submission_age > CheatDetectionConfig.MAX_SUBMISSION_AGE_HOURS:
             warnings.append(
@@ -219,26 +478,21 @@ class HealthDataValidator:
         )
     
     @staticmethod
-    def check_submission_rate(user_id: str, timestamp: datetime) -> bool:
+    def check_submission_rate(user_id: str, timestamp_us: int) -> bool:
         """
         Prevent rapid-fire submissions (potential bot behavior)
         """
         if user_id not in user_submission_history:
-            user_submission_history[user_id] = []
+            user_submission_history[user_id] = SubmissionHistory()
         
         history = user_submission_history[user_id]
         
-        # Check last submission
-        if history:
-            last_submission = history[-1]
-            time_diff = (timestamp - last_submission).total_seconds() / 60
-            
-            if time_diff < CheatDetectionConfig.MIN_SUBMISSION_INTERVAL_MINUTES:
-                return False
+        # Reject if anything was accepted within the minimum interval before this one
+        window_us = CheatDetectionConfig.MIN_SUBMISSION_INTERVAL_MINUTES * 60_000_000
+        if history.count_after(timestamp_us - window_us) > 0:
+            return False
         
-        # Add to history and maintain only recent submissions
-        history.append(timestamp)
-        user_submission_history[user_id] = history[-100:]  # Keep last 100
+        history.append(timestamp_us)
         
         return True
     
@@ -254,19 +508,19 @@ class HealthDataValidator:
         
         if user_id not in user_statistics:
             user_statistics[user_id] = {
-                'steps': [],
-                'calories': [],
-                'distance': []
+                'steps': RollingWindow(CheatDetectionConfig.STATS_WINDOW_SIZE),
+                'calories': RollingWindow(CheatDetectionConfig.STATS_WINDOW_SIZE),
+                'distance': RollingWindow(CheatDetectionConfig.STATS_WINDOW_SIZE)
             }
         
         stats = user_statistics[user_id]
         
         # Check if we have enough historical data
-        if len(stats['steps']) >= 7:  # Need at least a week of data
+        if stats['steps'].count >= CheatDetectionConfig.MIN_STATS_HISTORY:
             
             # Steps anomaly
-            steps_mean = np.mean(stats['steps'])
-            steps_std = np.std(stats['steps'])
+            steps_mean = stats['steps'].mean
+            steps_std = stats['steps'].std
             
             if steps_std > 0:
                 steps_z_score = abs((data.steps - steps_mean) / steps_std)
@@ -278,8 +532,8 @@ class HealthDataValidator:
                     )
             
             # Calories anomaly
-            calories_mean = np.mean(stats['calories'])
-            calories_std = np.std(stats['calories'])
+            calories_mean = stats['calories'].mean
+            calories_std = stats['calories'].std
             
             if calories_std > 0:
                 calories_z_score = abs((data.calories - calories_mean) / calories_std)
@@ -290,15 +544,10 @@ class HealthDataValidator:
                         f"standard deviations from your average ({calories_mean:.0f})"
                     )
         
-        # Update statistics (keep last 30 days)
-        stats['steps'].append(data.steps)
-        stats['calories'].append(data.calories)
-        stats['distance'].append(data.distance)
-        
-        for key in stats:
-            stats[key] = stats[key][-30:]
-        
-        user_statistics[user_id] = stats
+        # Update statistics (ring buffers keep the last 30 days)
+        stats['steps'].push(data.steps)
+        stats['calories'].push(data.calories)
+        stats['distance'].push(data.distance)
         
         return warnings
     
@@ -308,16 +557,9 @@ class HealthDataValidator:
         Validate that data comes from legitimate sources
         """
         warnings = []
-        trusted_sources = [
-            'com.apple.health',
-            'com.apple.Health',
-            'com.nike.nikeplus-gps',
-            'com.strava.Strava',
-            'com.fitbit.FitbitMobile'
-        ]
         
         for workout in data.workouts:
-            if workout.source not in trusted_sources:
+            if not is_trusted_source(workout.source):
                 warnings.append(
                     f"Workout from unrecognized source: {workout.source}"
                 )
@@ -326,9 +568,44 @@ class HealthDataValidator:
 
 # MARK: - API Endpoints
 
-@app.post("/api/health/submit", response_model=dict)
+def body_validation_error(e: ValidationError) -> RequestValidationError:
+    """
+    Shape errors from a manually parsed body like FastAPI's body errors
+    (loc starts with "body"); the rejected input is left out of the response
+    """
+    return RequestValidationError([
+        {**error, "loc": ("body", *error["loc"])}
+        for error in e.errors(include_input=False, include_url=False)
+    ])
+
+# Models behind manually parsed request bodies, added to the OpenAPI components
+request_body_schemas = {}
+
+def json_request_body(adapter: TypeAdapter) -> dict:
+    """
+    openapi_extra for a route that parses request.body() itself, so the docs
+    and generated clients still get the payload schema
+    """
+    schema = adapter.json_schema(ref_template='#/components/schemas/{model}')
+    request_body_schemas.update(schema.pop('$defs', {}))
+    return {"requestBody": {"content": {"application/json": {"schema": schema}}, "required": True}}
+
+def health_openapi() -> dict:
+    if app.openapi_schema is None:
+        components = FastAPI.openapi(app).setdefault('components', {}).setdefault('schemas', {})
+        for name, definition in request_body_schemas.items():
+            components.setdefault(name, definition)
+    return app.openapi_schema
+
+app.openapi = health_openapi
+
+@app.post(
+    "/api/health/submit",
+    response_model=SubmissionResult,
+    openapi_extra=json_request_body(TypeAdapter(HealthDataSubmission))
+)
 async def submit_health_data(
-    submission: HealthDataSubmission,
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """
@@ -337,36 +614,92 @@ async def submit_health_data(
     Returns points awarded and validation results
     """
     
+    # Parse the raw body straight into the model in pydantic-core (no json.loads round-trip)
+    try:
+        submission = HealthDataSubmission.model_validate_json(await request.body())
+    except ValidationError as e:
+        raise body_validation_error(e)
+    
     # TODO: Verify JWT token from credentials.credentials
     # For now, we'll use a simple approach
     
-    data = submission.data
-    user_id = submission.userId
+    now_us = time.time_ns() // 1000
     
     # 1. Verify cryptographic signature
-    # TODO: Get user's signing key from database
-    signing_key = "your-secret-key-here"  # Should be unique per user
+    # Disabled for demo (no HMAC work at all) - enable once signing keys are real
+    if CheatDetectionConfig.VERIFY_SIGNATURES:
+        signing_key = get_signing_key(submission.userId)
+        if not verify_signature(submission.data, signing_key):
+            raise HTTPException(status_code=403, detail="Invalid data signature")
     
-    # Commented out for demo - implement proper signature verification
-    # if not verify_signature(data, signing_key):
-    #     raise HTTPException(status_code=403, detail="Invalid data signature")
+    return model_json_response(process_submission(submission, now_us))
+
+HealthDataSubmissionList = TypeAdapter(
+    Annotated[List[HealthDataSubmission], Field(max_length=CheatDetectionConfig.MAX_BATCH_SUBMISSIONS)]
+)
+
+@app.post(
+    "/api/health/submit_batch",
+    response_model=BatchSubmissionResult,
+    openapi_extra=json_request_body(HealthDataSubmissionList)
+)
+async def submit_health_data_batch(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Submit several verified health payloads at once (retry queues, background sync)
+    
+    Returns one result per submission, in order
+    """
+    
+    try:
+        submissions = HealthDataSubmissionList.validate_json(await request.body())
+    except ValidationError as e:
+        raise body_validation_error(e)
+    
+    now_us = time.time_ns() // 1000
+    
+    if CheatDetectionConfig.VERIFY_SIGNATURES:
+        signatures_ok = verify_signatures(submissions)
+    else:
+        signatures_ok = [True] * len(submissions)
+    
+    results = []
+    for submission, signature_ok in zip(submissions, signatures_ok):
+        if not signature_ok:
+            results.append(SubmissionResult(accepted=False, message="Invalid data signature"))
+            continue
+        try:
+            results.append(process_submission(submission, now_us))
+        except HTTPException as e:
+            results.append(SubmissionResult(accepted=False, message=e.detail))
+    
+    return model_json_response(BatchSubmissionResult(results=results))
+
+def process_submission(submission: HealthDataSubmission, now_us: int) -> SubmissionResult:
+    """
+    Run the anti-cheat pipeline on a signature-checked submission and score it
+    """
+    data = submission.data
+    user_id = submission.userId
     
     # 2. Check submission rate
-    if not HealthDataValidator.check_submission_rate(user_id, data.rawData.timestamp):
+    if not HealthDataValidator.check_submission_rate(user_id, data.rawData._timestamp_us):
         raise HTTPException(
             status_code=429,
             detail="Submissions too frequent. Please wait before submitting again."
         )
     
     # 3. Validate data consistency
-    validation = HealthDataValidator.validate_data_consistency(data.rawData)
+    validation = HealthDataValidator.validate_data_consistency(data.rawData, now_us)
     
     if not validation.isValid:
-        return {
-            "accepted": False,
-            "validation": validation.dict(),
-            "message": "Data validation failed. Please ensure your data is accurate."
-        }
+        return SubmissionResult(
+            accepted=False,
+            validation=validation,
+            message="Data validation failed. Please ensure your data is accurate."
+        )
     
     # 4. Check for statistical anomalies
     anomaly_warnings = HealthDataValidator.detect_statistical_anomalies(
@@ -386,12 +719,12 @@ async def submit_health_data(
     # 7. Store data (implement database storage)
     # await store_health_data(user_id, data.rawData, validation)
     
-    return {
-        "accepted": True,
-        "points": final_points,
-        "validation": validation.dict(),
-        "message": "Health data accepted successfully!"
-    }
+    return SubmissionResult(
+        accepted=True,
+        points=final_points,
+        validation=validation,
+        message="Health data accepted successfully!"
+    )
 
 @app.get("/api/health/status/{user_id}")
 async def get_user_health_status(user_id: str):
@@ -401,7 +734,7 @@ async def get_user_health_status(user_id: str):
     
     stats = user_statistics.get(user_id, {})
     
-    if not stats or not stats.get('steps'):
+    if not stats or stats['steps'].count == 0:
         return {
             "hasData": False,
             "message": "No health data available yet"
@@ -410,10 +743,10 @@ async def get_user_health_status(user_id: str):
     return {
         "hasData": True,
         "statistics": {
-            "averageSteps": np.mean(stats['steps']) if stats['steps'] else 0,
-            "averageCalories": np.mean(stats['calories']) if stats['calories'] else 0,
-            "averageDistance": np.mean(stats['distance']) if stats['distance'] else 0,
-            "daysTracked": len(stats['steps'])
+            "averageSteps": stats['steps'].mean,
+            "averageCalories": stats['calories'].mean,
+            "averageDistance": stats['distance'].mean,
+            "daysTracked": stats['steps'].count
         }
     }
 
@@ -424,26 +757,18 @@ def calculate_points(data: RawHealthData) -> int:
     Calculate points based on health activity
     Customize this based on your Fantasy Life League rules
     """
-    points = 0
-    
-    # Steps points (1 point per 1000 steps)
-    points += int(data.steps / 1000)
-    
-    # Workout points (10 points per workout)
-    points += len(data.workouts) * 10
-    
-    # Workout duration points (1 point per 5 minutes)
-    total_workout_time = sum(w.duration for w in data.workouts) / 60
-    points += int(total_workout_time / 5)
-    
-    # Calorie points (1 point per 100 calories)
-    points += int(data.calories / 100)
-    
-    # Distance points (1 point per km)
-    points += int(data.distance / 1000)
+    n_workouts = len(data.workouts)
+    
+    points = (
+        int(data.steps / 1000)                            # 1 point per 1000 steps
+        + n_workouts * 10                                 # 10 points per workout
+        + int(float(data._workout_durations.sum()) / 300) # 1 point per 5 minutes of workouts
+        + int(data.calories / 100)                        # 1 point per 100 calories
+        + int(data.distance / 1000)                       # 1 point per km
+    )
     
     # Bonus for consistency
-    if data.steps > 8000 and len(data.workouts) > 0:
+    if data.steps > 8000 and n_workouts > 0:
         points += 50  # Consistency bonus
     
     return points
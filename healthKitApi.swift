@@ -232,9 +232,11 @@ class HealthKitManager: ObservableObject {
     // MARK: - Cryptographic Signing
     
     private func createVerifiedData(from rawData: RawHealthData) throws -> VerifiedHealthData {
-        // Serialize data
+        // Serialize data in the canonical form the server rebuilds (RawHealthData.canonical_bytes):
+        // sorted keys, unescaped slashes, whole-number doubles as integers, second-precision UTC dates
         let encoder = JSONEncoder()
         encoder.dateEncodingStrategy = .iso8601
+        encoder.outputFormatting = [.sortedKeys, .withoutEscapingSlashes]
         let jsonData = try encoder.encode(rawData)
         
         // Create signature using HMAC
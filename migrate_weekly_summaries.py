@@ -0,0 +1,67 @@
+"""
+One-time backfill of weekly_summaries for entries logged before the
+collection existed. Run it once after deploying, not from the API lifespan:
+
+    python migrate_weekly_summaries.py            # current ISO week
+    python migrate_weekly_summaries.py 2025 42    # a specific ISO week
+
+Summaries that already exist are left untouched, so it is safe to re-run.
+/habits/log rebuilds a missing summary on its own, so this only matters for
+users who have not logged since the deploy.
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+from typing import Any, Dict, List
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from backend import client, habit_entries_collection, weekly_summaries_collection, week_date_bounds
+from fll_fast import fold_week_entries
+
+
+async def backfill_week_summaries(year: int, week_number: int) -> int:
+    first_day, last_day = week_date_bounds(year, week_number)
+    entries = await habit_entries_collection.find(
+        {"date": {"$gte": first_day, "$lte": last_day}},
+        {"user_id": 1, "points": 1, "total_points": 1, "_id": 0},
+    ).to_list(None)
+
+    entries_by_user: Dict[ObjectId, List[Dict[str, Any]]] = {}
+    for entry in entries:
+        entries_by_user.setdefault(entry["user_id"], []).append(entry)
+
+    if not entries_by_user:
+        return 0
+
+    result = await weekly_summaries_collection.bulk_write(
+        [
+            UpdateOne(
+                {"user_id": user_id, "year": year, "week_number": week_number},
+                {"$setOnInsert": fold_week_entries(user_entries)},
+                upsert=True,
+            )
+            for user_id, user_entries in entries_by_user.items()
+        ],
+        ordered=False,
+    )
+    return result.upserted_count
+
+
+async def main() -> None:
+    if len(sys.argv) == 3:
+        year, week_number = int(sys.argv[1]), int(sys.argv[2])
+    else:
+        year, week_number, _ = datetime.now().isocalendar()
+
+    try:
+        created = await backfill_week_summaries(year, week_number)
+        print(f"✅ Created {created} weekly summaries for {year}-W{week_number:02d}")
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+from fll_fast import calculate_score, fold_week_entries, week_summary_increments
+
+DEFAULT_GOALS = {"sleep": 8.0, "study": 2.0, "exercise": 1.0, "hydration": 8, "nutrition": 1}
+
+
+def test_score_rounds_each_ratio_like_python_round():
+    points = calculate_score({"sleep": 1.96, "study": 0.01, "hydration": 3}, DEFAULT_GOALS)
+
+    assert points == {"sleep": 2.5, "study": 0.1, "hydration": 3.8}
+
+
+def test_score_is_capped_at_one_and_a_half_times_the_goal():
+    assert calculate_score({"sleep": 16.0, "exercise": 0.5}, DEFAULT_GOALS) == {"sleep": 15.0, "exercise": 5.0}
+
+
+def test_nutrition_without_a_positive_goal_is_all_or_nothing():
+    goals = {**DEFAULT_GOALS, "nutrition": 0}
+
+    assert calculate_score({"nutrition": 1}, goals) == {"nutrition": 10.0}
+    assert calculate_score({"nutrition": 0}, goals) == {"nutrition": 0.0}
+
+
+def test_missing_values_zero_goals_and_untracked_categories_score_nothing():
+    goals = {**DEFAULT_GOALS, "study": 0.0, "exercise": None}
+    entry = {"sleep": None, "study": 3.0, "exercise": 1.0, "mindfulness": 20}
+
+    assert calculate_score(entry, goals) == {"sleep": 0.0, "study": 0.0, "exercise": 0.0, "mindfulness": 0.0}
+
+
+def test_first_entry_of_the_day_counts_a_new_day():
+    increments = week_summary_increments(None, {"sleep": 8.0, "study": 5.0}, 13.0)
+
+    assert increments == {
+        "days_logged": 1,
+        "total": 13.0,
+        "categories.sleep": 8.0,
+        "categories.study": 5.0,
+    }
+
+
+def test_replacing_an_entry_applies_only_the_difference():
+    previous = {"points": {"sleep": 8.0, "hydration": 4.0}, "total_points": 12.0}
+
+    increments = week_summary_increments(previous, {"sleep": 10.0, "study": 3.0}, 13.0)
+
+    assert increments == {
+        "days_logged": 0,
+        "total": 1.0,
+        "categories.sleep": 2.0,
+        "categories.study": 3.0,
+        "categories.hydration": -4.0,
+    }
+
+
+def test_increments_replayed_over_a_week_match_a_recompute():
+    days = [
+        (None, {"sleep": 8.0}, 8.0),
+        ({"points": {"sleep": 8.0}, "total_points": 8.0}, {"sleep": 6.0, "study": 2.0}, 8.0),
+        (None, {"exercise": 10.0}, 10.0),
+    ]
+    summary = {"days_logged": 0, "total": 0.0, "categories": {}}
+    for previous, points, total_points in days:
+        for field, delta in week_summary_increments(previous, points, total_points).items():
+            if field.startswith("categories."):
+                cat = field.split(".", 1)[1]
+                summary["categories"][cat] = summary["categories"].get(cat, 0.0) + delta
+            else:
+                summary[field] += delta
+
+    final_entries = [
+        {"points": {"sleep": 6.0, "study": 2.0}, "total_points": 8.0},
+        {"points": {"exercise": 10.0}, "total_points": 10.0},
+    ]
+    assert summary == fold_week_entries(final_entries)
+
+
+def test_fold_of_no_entries_is_an_empty_summary():
+    assert fold_week_entries([]) == {"days_logged": 0, "total": 0.0, "categories": {}}
@@ -0,0 +1,79 @@
+import random
+import statistics
+
+import pytest
+
+from backendHealthKit import CheatDetectionConfig, RollingWindow, SubmissionHistory
+
+
+def test_rolling_window_matches_statistics_before_and_after_wrapping():
+    size = 7
+    window = RollingWindow(size)
+    values = [8000.0, 12000.5, 9500.0, 30.0, 15000.0, 7000.25, 11000.0, 9999.0, 250.0, 18000.0, 5.5, 12345.0, 8000.0]
+
+    for i, value in enumerate(values):
+        window.push(value)
+        recent = values[max(0, i + 1 - size):i + 1]
+        assert window.count == len(recent)
+        assert window.mean == pytest.approx(statistics.fmean(recent))
+        assert window.std == pytest.approx(statistics.pstdev(recent), rel=1e-9, abs=1e-6)
+
+
+def test_rolling_window_of_identical_values_has_zero_spread():
+    window = RollingWindow(3)
+    for _ in range(10):
+        window.push(4200.0)
+
+    assert window.mean == pytest.approx(4200.0)
+    assert window.std == pytest.approx(0.0, abs=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("constant", [0.0, 8000.0])
+def test_rolling_window_is_exactly_flat_after_varied_values(seed, constant):
+    rng = random.Random(seed)
+    window = RollingWindow(CheatDetectionConfig.STATS_WINDOW_SIZE)
+    for _ in range(200):
+        window.push(float(rng.randint(0, 30000)))
+    for _ in range(CheatDetectionConfig.STATS_WINDOW_SIZE):
+        window.push(constant)
+
+    # Any residue here would pass the std > 0 guard and flag the next small change
+    assert window.std == 0.0
+    assert window.mean == constant
+
+
+def test_empty_rolling_window_has_zero_std():
+    assert RollingWindow(5).std == 0.0
+
+
+def test_submission_history_grows_and_keeps_order():
+    history = SubmissionHistory(capacity=2)
+    for timestamp_us in (10, 20, 30, 40, 50):
+        history.append(timestamp_us)
+
+    assert history.size == 5
+    assert list(history.times[:history.size]) == [10, 20, 30, 40, 50]
+
+
+def test_submission_history_compacts_to_the_most_recent_limit(monkeypatch):
+    monkeypatch.setattr(CheatDetectionConfig, "SUBMISSION_HISTORY_LIMIT", 4)
+    history = SubmissionHistory(capacity=2)
+    for timestamp_us in range(1, 10):
+        history.append(timestamp_us)
+
+    # The buffer never grows past 2 * limit; the ninth append drops the oldest four
+    assert len(history.times) == 8
+    assert list(history.times[:history.size]) == [5, 6, 7, 8, 9]
+
+
+def test_count_after_is_strictly_after():
+    history = SubmissionHistory()
+    for timestamp_us in (10, 20, 30):
+        history.append(timestamp_us)
+
+    assert history.count_after(0) == 3
+    assert history.count_after(19) == 2
+    assert history.count_after(20) == 1
+    assert history.count_after(30) == 0
+    assert SubmissionHistory().count_after(0) == 0
@@ -0,0 +1,47 @@
+import hmac
+
+from backendHealthKit import RawHealthData, hmac_sha256
+
+RAW_DATA = {
+    "date": "2025-01-01T00:00:00+01:00",
+    "steps": 9000,
+    "calories": 450.5,
+    "distance": 6750,
+    "workouts": [
+        {
+            "type": 37,
+            "duration": 1800,
+            "calories": 300,
+            "distance": 5000,
+            "startDate": "2025-01-01T07:00:00Z",
+            "endDate": "2025-01-01T07:30:00Z",
+            "source": "com.apple.health/watch",
+        }
+    ],
+    "heartRateReadings": [{"bpm": 72.5, "timestamp": "2025-01-01T07:10:00Z"}],
+    "deviceInfo": {"model": "iPhone", "systemVersion": "18.0", "identifierForVendor": "ABC"},
+    "timestamp": "2025-01-01T08:00:00Z",
+}
+
+# What the iOS client's signing encoder produces for RAW_DATA
+CLIENT_BYTES = (
+    b'{"calories":450.5,"date":"2024-12-31T23:00:00Z",'
+    b'"deviceInfo":{"identifierForVendor":"ABC","model":"iPhone","systemVersion":"18.0"},'
+    b'"distance":6750,"heartRateReadings":[{"bpm":72.5,"timestamp":"2025-01-01T07:10:00Z"}],'
+    b'"steps":9000,"timestamp":"2025-01-01T08:00:00Z",'
+    b'"workouts":[{"calories":300,"distance":5000,"duration":1800,"endDate":"2025-01-01T07:30:00Z",'
+    b'"source":"com.apple.health/watch","startDate":"2025-01-01T07:00:00Z","type":37}]}'
+)
+
+
+def test_canonical_bytes_match_the_client_signing_encoding():
+    assert RawHealthData.model_validate(RAW_DATA).canonical_bytes() == CLIENT_BYTES
+
+
+def test_client_signature_verifies_against_canonical_bytes():
+    key = b"signing-key"
+    client_signature = hmac.new(key, CLIENT_BYTES, "sha256").digest()
+
+    server_signature = hmac_sha256(key, RawHealthData.model_validate(RAW_DATA).canonical_bytes())
+
+    assert hmac.compare_digest(client_signature, server_signature)
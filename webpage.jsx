@@ -990,7 +990,8 @@ function League() {
         setFormLoading(true);
         setError(null);
         try {
-            await api.league.create({ name: leagueName });
+            const result = await api.league.create({ name: leagueName });
+            localStorage.setItem('token', result.access_token);
             await refreshUser();
             setLeagueName('');
         } catch (err) {
@@ -1005,7 +1006,8 @@ function League() {
         setFormLoading(true);
         setError(null);
         try {
-            await api.league.join({ code: joinCode });
+            const result = await api.league.join({ code: joinCode });
+            localStorage.setItem('token', result.access_token);
             await refreshUser();
             setJoinCode('');
         } catch (err) {